@@ -2,3 +2,4 @@ from .aspects import Aspects, AspectTypes
 from .assets import Asset, AssetTypes
 from .attrs import Attrs, AttrTypes
 from .char import Character
+from .roster import Roster
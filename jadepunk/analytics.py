@@ -0,0 +1,122 @@
+import numpy as np
+
+from .assets import Asset, AssetTypes
+from .attrs import AttrTypes
+
+ATTR_ORDER = list(AttrTypes)
+ASSET_ORDER = list(AssetTypes)
+MISSING = -1
+
+
+class Columns(object):
+    """
+    Columnar arrays extracted from a collection of characters in a single pass.
+    """
+    def __init__(self, chars):
+        attrs = []
+        max_refresh = []
+        asset_char = []
+        asset_type = []
+        asset_refresh = []
+        prop_asset = []
+        prop_cls = []
+        prop_feature = []
+        self.prop_names = []
+        prop_codes = {}
+        asset_idx = 0
+        for char_idx, char in enumerate(chars):
+            attrs.append([self._rating(char.attrs.attrs.get(attr)) for attr in ATTR_ORDER])
+            max_refresh.append(char.max_ref)
+            for asset in char.assets:
+                asset_char.append(char_idx)
+                asset_type.append(ASSET_ORDER.index(asset.type))
+                asset_refresh.append(asset.refresh())
+                for prop in asset.properties:
+                    name = prop.name()
+                    if name not in prop_codes:
+                        prop_codes[name] = len(self.prop_names)
+                        self.prop_names.append(name)
+                    prop_asset.append(asset_idx)
+                    prop_cls.append(prop_codes[name])
+                    prop_feature.append(isinstance(prop, Asset.Feature))
+                asset_idx += 1
+
+        self.attrs = np.array(attrs, dtype=np.int64).reshape(-1, len(ATTR_ORDER))
+        self.max_refresh = np.array(max_refresh, dtype=np.int64)
+        self.asset_char = np.array(asset_char, dtype=np.int64)
+        self.asset_type = np.array(asset_type, dtype=np.int64)
+        self.asset_refresh = np.array(asset_refresh, dtype=np.int64)
+        self.prop_asset = np.array(prop_asset, dtype=np.int64)
+        self.prop_cls = np.array(prop_cls, dtype=np.int64)
+        self.prop_feature = np.array(prop_feature, dtype=bool)
+
+    @staticmethod
+    def _rating(val):
+        """
+        Missing or invalid ratings are stored as MISSING, so they can be masked out.
+        """
+        if isinstance(val, int) and not isinstance(val, bool) and val >= 0:
+            return val
+        return MISSING
+
+    def __len__(self):
+        return len(self.max_refresh)
+
+    def refresh_spent(self):
+        return np.bincount(self.asset_char, weights=self.asset_refresh,
+                           minlength=len(self)).astype(np.int64)
+
+
+class Report(object):
+    def __init__(self, chars, top=5):
+        """
+        :type chars: collections.abc.Iterable
+        :type top: int
+        :param top: How many of the most common features and flaws to report
+        """
+        cols = chars if isinstance(chars, Columns) else Columns(chars)
+        self.count = len(cols)
+
+        self.attr_distribution = {}
+        for i, attr in enumerate(ATTR_ORDER):
+            ratings = cols.attrs[:, i]
+            self.attr_distribution[attr] = np.bincount(ratings[ratings != MISSING])
+
+        spent = cols.refresh_spent()
+        self.refresh_spent = spent
+        self.mean_refresh_spent = float(spent.mean()) if self.count > 0 else 0.0
+        self.mean_max_refresh = float(cols.max_refresh.mean()) if self.count > 0 else 0.0
+        self.refresh_remaining = cols.max_refresh - spent
+
+        type_counts = np.bincount(cols.asset_type, minlength=len(ASSET_ORDER))
+        type_refresh = np.bincount(cols.asset_type, weights=cols.asset_refresh, minlength=len(ASSET_ORDER))
+        self.asset_type_mix = {a_type: int(type_counts[i]) for i, a_type in enumerate(ASSET_ORDER)}
+        self.mean_asset_refresh = {a_type: float(type_refresh[i] / type_counts[i])
+                                   for i, a_type in enumerate(ASSET_ORDER) if type_counts[i] > 0}
+
+        self.common_features = self._most_common(cols, cols.prop_feature, top)
+        self.common_flaws = self._most_common(cols, ~cols.prop_feature, top)
+
+    @staticmethod
+    def _most_common(cols, mask, top):
+        counts = np.bincount(cols.prop_cls[mask], minlength=len(cols.prop_names))
+        order = np.argsort(-counts, kind="stable")[:top]
+        return [(cols.prop_names[i], int(counts[i])) for i in order if counts[i] > 0]
+
+    def render(self, engine):
+        engine.title("Roster Analytics")
+        engine.kv("Characters", self.count)
+        engine.heading("Attributes")
+        for attr, dist in self.attr_distribution.items():
+            engine.kv(attr.value, " ".join(["{}x+{}".format(n, r) for r, n in enumerate(dist)]))
+        engine.heading("Refresh")
+        engine.kv("Mean Spent", "{:.2f}".format(self.mean_refresh_spent))
+        engine.kv("Mean Max", "{:.2f}".format(self.mean_max_refresh))
+        engine.heading("Assets")
+        for a_type, n in self.asset_type_mix.items():
+            if a_type in self.mean_asset_refresh:
+                engine.kv(a_type.value, "{} (mean cost {:.2f} refresh)".format(n, self.mean_asset_refresh[a_type]))
+            else:
+                engine.kv(a_type.value, n)
+        engine.kv("Common Features", ", ".join(["{} ({})".format(n, c) for n, c in self.common_features]))
+        engine.kv("Common Flaws", ", ".join(["{} ({})".format(n, c) for n, c in self.common_flaws]))
@@ -1,4 +1,5 @@
 import enum
+import inspect
 import math
 
 from .attrs import AttrTypes
@@ -25,6 +26,13 @@ class Asset(object):
         def name(self):
             return type(self).__name__
 
+        def params(self):
+            """
+            The keyword arguments this property was constructed with.
+            """
+            sig = inspect.signature(type(self).__init__)
+            return {k: getattr(self, k) for k in list(sig.parameters)[1:]}
+
         def err_txt(self, txt, *args):
             return self.master.err_txt("Property ({}): {}", self.name(), txt.format(*args))
 
@@ -263,6 +271,9 @@ class Asset(object):
         def desc(self, engine):
             return self.prop.render(engine)
 
+        def params(self):
+            return {"a_type": self.fake_type, "prop": self.prop}
+
         def _fake_master(self):
             fake = Asset(self.fake_type,
                          features=[],
@@ -339,7 +350,8 @@ class Asset(object):
                  guiding=None,
                  name=None,
                  mastercrafted=False,
-                 gm_approved=False):
+                 gm_approved=False,
+                 key=None):
         """
         :type a_type: Asset.Types
         :type features: list
@@ -347,6 +359,8 @@ class Asset(object):
         :type functional: str
         :type guiding: str
         :type name: str
+        :type key: str
+        :param key: A stable identifier, used to follow the asset between versions of a character
         :rtype: Asset
         """
         self.type = a_type
@@ -355,6 +369,7 @@ class Asset(object):
         self.guiding = guiding
         self.raw_name = name
         self.silence_gm = gm_approved
+        self.key = key
         self.mastercrafted = mastercrafted
 
         if self.type == AssetTypes.ALLY:
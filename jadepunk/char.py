@@ -9,16 +9,19 @@ class Character(object):
                  assets,
                  background=None,
                  max_refresh=7,
-                 new_gen=True):
+                 new_gen=True,
+                 out=None):
         self.name = name
         self.aspects = aspects
         self.attrs = attrs
         self.assets = assets
         self.max_ref = max_refresh
         self.background = background
-        val = Validator(new_gen)
+        self.new_gen = new_gen
+        val = Validator(new_gen, out)
         self.validate(val)
         val.check()
+        self.val_log = val.val_log
 
     def refresh(self):
         return self.max_ref - sum([asset.refresh() for asset in self.assets])
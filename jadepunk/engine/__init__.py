@@ -1,2 +1,2 @@
-from .base import EngineLoader
+from .base import EngineLoader, EngineRegistry, default_registry
 from . import markdown, moinmoin
@@ -1,68 +1,83 @@
-class EngineLoader(object):
-    engine_store = {}
-
-    def __new__(cls, name):
-        return cls.engine_store[name]
+class EngineRegistry(object):
+    def __init__(self, engines=None):
+        self.engines = dict(engines or {})
 
-    @classmethod
-    def register(cls, name):
+    def register(self, name):
         def wrapper(obj):
-            cls.engine_store[name] = obj
+            self.engines[name] = obj
             return obj
         return wrapper
 
+    def copy(self):
+        return EngineRegistry(self.engines)
+
+    def get(self, name, out=None):
+        """
+        :param out: File to write to, defaults to sys.stdout
+        :rtype: BaseEngine
+        """
+        return self.engines[name](out)
+
+
+default_registry = EngineRegistry()
+
+
+class EngineLoader(object):
+    """
+    Access to the engines registered at import time.
+    Use an EngineRegistry directly for a separate set of engines.
+    """
+    def __new__(cls, name, out=None):
+        return default_registry.get(name, out)
+
+    @staticmethod
+    def register(name):
+        return default_registry.register(name)
+
 
 class BaseEngine(object):
     BOLD_EM = 0
     ITAL_EM = 0
     TITLE_HEADER = 1
+    EXT = ".txt"
     KV_END = "\n"
 
-    @classmethod
-    def header(cls, txt, lv):
+    def __init__(self, out=None):
+        self.out = out
+
+    def header(self, txt, lv):
         raise NotImplementedError()
 
-    @classmethod
-    def em(cls, txt, num):
+    def em(self, txt, num):
         raise NotImplementedError()
 
-    @classmethod
-    def bold(cls, txt):
-        return cls.em(txt, cls.BOLD_EM)
+    def bold(self, txt):
+        return self.em(txt, self.BOLD_EM)
 
-    @classmethod
-    def italics(cls, txt):
-        return cls.em(txt, cls.ITAL_EM)
+    def italics(self, txt):
+        return self.em(txt, self.ITAL_EM)
 
-    @classmethod
-    def boldit(cls, txt):
-        return cls.em(txt, cls.ITAL_EM + cls.BOLD_EM)
+    def boldit(self, txt):
+        return self.em(txt, self.ITAL_EM + self.BOLD_EM)
 
-    @classmethod
-    def title(cls, txt):
-        cls.header(txt, cls.TITLE_HEADER)
+    def title(self, txt):
+        self.header(txt, self.TITLE_HEADER)
 
-    @classmethod
-    def heading(cls, txt):
-        cls.header(txt, cls.TITLE_HEADER + 1)
+    def heading(self, txt):
+        self.header(txt, self.TITLE_HEADER + 1)
 
-    @classmethod
-    def subheading(cls, txt):
-        cls.header(txt, cls.TITLE_HEADER + 2)
+    def subheading(self, txt):
+        self.header(txt, self.TITLE_HEADER + 2)
 
-    @classmethod
-    def text(cls, txt, end="\n"):
-        print(txt, end=end)
+    def text(self, txt, end="\n"):
+        print(txt, end=end, file=self.out)
 
-    @classmethod
-    def tag(cls, txt):
-        cls.text(cls.bold(txt + ":") + " ", end="")
+    def tag(self, txt):
+        self.text(self.bold(txt + ":") + " ", end="")
 
-    @classmethod
-    def kv(cls, key, value):
-        cls.tag(key)
-        cls.text(value, end=cls.KV_END)
+    def kv(self, key, value):
+        self.tag(key)
+        self.text(value, end=self.KV_END)
 
-    @classmethod
-    def aspect(cls, key, txt):
-        cls.kv(key, cls.boldit(txt))
+    def aspect(self, key, txt):
+        self.kv(key, self.boldit(txt))
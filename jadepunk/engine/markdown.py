@@ -7,12 +7,11 @@ class Markdown(BaseEngine):
     BOLD_EM = 2
     ITAL_EM = 1
     TITLE_HEADER = 1
+    EXT = ".md"
     KV_END = "  \n"
 
-    @classmethod
-    def header(cls, txt, lv):
-        print("{l} {t}".format(t=txt, l="#"*lv))
+    def header(self, txt, lv):
+        self.text("{l} {t}".format(t=txt, l="#"*lv))
 
-    @classmethod
-    def em(cls, txt, num):
+    def em(self, txt, num):
         return "{l}{t}{l}".format(t=txt, l="*"*num)
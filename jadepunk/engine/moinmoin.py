@@ -9,10 +9,8 @@ class MoinMoin(BaseEngine):
     TITLE_HEADER = 2
     KV_END = "\n\n"
 
-    @classmethod
-    def header(cls, txt, lv):
-        cls.text("{l} {t} {l}".format(t=txt, l="="*lv))
+    def header(self, txt, lv):
+        self.text("{l} {t} {l}".format(t=txt, l="="*lv))
 
-    @classmethod
-    def em(cls, txt, num):
+    def em(self, txt, num):
         return "{l}{t}{l}".format(t=txt, l="'"*num)
@@ -0,0 +1,247 @@
+"""
+Content hashes of characters and their parts, combined into trees so that
+two versions can be compared by descending only into the parts that differ.
+
+Hashing a Character always builds its whole tree, as characters and assets
+can be edited in place. To avoid rehashing, keep the HashNode built for each
+version (eg. alongside the content_hash used as a cache key) and diff the
+trees. For assets that are never edited in place, such as interned ones or
+those in a jadepunk.history.History, pass a cache to hash_char so that each
+asset is hashed only once.
+"""
+import hashlib
+import json
+
+from . import Aspects, Asset, Attrs, Character
+from .loader import dump_aspects, dump_attrs, dump_prop, json_default
+
+
+def _digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8") if isinstance(part, str) else part)
+    return h.hexdigest()
+
+
+def _leaf(value):
+    return HashNode(_digest(json.dumps(value, default=json_default, sort_keys=True)))
+
+
+def _keyed(items):
+    """
+    Key a list of (name, item) pairs by name, numbering any repeats.
+    """
+    seen = {}
+    keyed = []
+    for name, item in items:
+        n = seen.get(name, 0)
+        seen[name] = n + 1
+        keyed.append((name if n == 0 else "{} #{}".format(name, n + 1), item))
+    return keyed
+
+
+class HashNode(object):
+    """
+    A content hash along with the hashes of each named part it was built from.
+    The label is a readable name for reports (eg. an asset's name) and is not part of the digest.
+    """
+    def __init__(self, digest, children=None, label=None):
+        self.digest = digest
+        self.children = children or {}
+        self.label = label
+
+    @classmethod
+    def branch(cls, tag, children, label=None):
+        return cls(_digest(tag, *[k + "\0" + c.digest for k, c in children.items()]), children, label)
+
+    def __eq__(self, other):
+        return isinstance(other, HashNode) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return "HashNode({})".format(self.digest)
+
+
+def hash_prop(prop):
+    return _leaf([prop.name(), dump_prop(prop)])
+
+
+def hash_aspects(aspects):
+    return _leaf(dump_aspects(aspects))
+
+
+def hash_attrs(attrs):
+    return _leaf(dump_attrs(attrs))
+
+
+def hash_asset(asset, cache=None):
+    """
+    :param cache: Optional weakref.WeakKeyDictionary of previously hashed assets,
+                  only suitable for assets that are not edited in place (eg. interned ones).
+    """
+    if cache is not None and asset in cache:
+        return cache[asset]
+    fields = {"type": _leaf(asset.type),
+              "name": _leaf(asset.raw_name),
+              "functional": _leaf(asset.functional),
+              "guiding": _leaf(asset.guiding),
+              "mastercrafted": _leaf(asset.mastercrafted),
+              "gm_approved": _leaf(asset.silence_gm)}
+    # Property order carries no meaning (Asset appends default Ally properties after the flaws)
+    props = {k: hash_prop(p) for k, p in sorted(_keyed([(p.name(), p) for p in asset.properties]),
+                                                 key=lambda kp: kp[0])}
+    node = HashNode.branch("Asset", {"fields": HashNode.branch("fields", fields),
+                                     "props": HashNode.branch("props", props)},
+                           label=asset.name())
+    if cache is not None:
+        cache[asset] = node
+    return node
+
+
+def asset_key(asset):
+    """
+    The key of an asset within a character's hash tree, its stable key if it has one, otherwise its name.
+    """
+    if asset.key is not None:
+        return "key:{}".format(asset.key)
+    return asset.name()
+
+
+def hash_char(char, cache=None):
+    fields = {"name": _leaf(char.name),
+              "background": _leaf(char.background),
+              "max_refresh": _leaf(char.max_ref),
+              "new_gen": _leaf(char.new_gen)}
+    assets = {k: hash_asset(a, cache) for k, a in _keyed([(asset_key(a), a) for a in char.assets])}
+    return HashNode.branch("Character", {"fields": HashNode.branch("fields", fields),
+                                         "aspects": hash_aspects(char.aspects),
+                                         "attrs": hash_attrs(char.attrs),
+                                         "assets": HashNode.branch("assets", assets)})
+
+
+def hash_tree(obj):
+    """
+    :type obj: Character | Asset | Asset.Prop | Aspects | Attrs
+    :rtype: HashNode
+    """
+    if isinstance(obj, Character):
+        return hash_char(obj)
+    if isinstance(obj, Asset):
+        return hash_asset(obj)
+    if isinstance(obj, Asset.Prop):
+        return hash_prop(obj)
+    if isinstance(obj, Aspects):
+        return hash_aspects(obj)
+    if isinstance(obj, Attrs):
+        return hash_attrs(obj)
+    raise TypeError("Cannot hash {}".format(type(obj).__name__))
+
+
+def content_hash(obj):
+    """
+    Hashes the whole of obj, keep the result rather than calling this again for the same version.
+
+    :rtype: str
+    """
+    return hash_tree(obj).digest
+
+
+def _compare(old, new):
+    added = [k for k in new.children if k not in old.children]
+    removed = [k for k in old.children if k not in new.children]
+    changed = [k for k in new.children
+               if k in old.children and old.children[k].digest != new.children[k].digest]
+    return added, removed, changed
+
+
+def _pair_assets(old, new):
+    """
+    Match up the assets of two versions of a character.
+    Assets are paired, in order of preference, by having identical content,
+    by key (or name, for assets without a stable key), then by having
+    identical properties (eg. a renamed asset).
+
+    :return: The changed (old key, new key) pairs, and the added and removed keys
+    """
+    removed = [k for k in old.children if k not in new.children or old.children[k] != new.children[k]]
+    added = [k for k in new.children if k not in old.children or old.children[k] != new.children[k]]
+
+    def match(same):
+        pairs = []
+        for new_k in list(added):
+            old_k = next((k for k in removed if same(k, new_k)), None)
+            if old_k is not None:
+                removed.remove(old_k)
+                added.remove(new_k)
+                pairs.append((old_k, new_k))
+        return pairs
+
+    match(lambda o, n: old.children[o] == new.children[n])
+    pairs = match(lambda o, n: o == n)
+    pairs += match(lambda o, n: old.children[o].children["props"] == new.children[n].children["props"])
+    return pairs, added, removed
+
+
+class AssetDiff(object):
+    def __init__(self, old, new):
+        _, _, self.changed_fields = _compare(old.children["fields"], new.children["fields"])
+        self.added_props, self.removed_props, self.changed_props = _compare(old.children["props"],
+                                                                            new.children["props"])
+
+
+class CharDiff(object):
+    """
+    The changes between two versions of a character. Only the parts of
+    the hash trees whose digests differ are descended into.
+    Assets are reported as (key, name) pairs, as the key of an asset with
+    a stable key (eg. in a History) is not meaningful to read.
+    """
+    def __init__(self, old, new):
+        self.changed_fields = []
+        self.aspects_changed = False
+        self.attrs_changed = False
+        self.added_assets = []
+        self.removed_assets = []
+        self.changed_assets = {}
+        if old.digest == new.digest:
+            return
+        _, _, changed = _compare(old, new)
+        if "fields" in changed:
+            _, _, self.changed_fields = _compare(old.children["fields"], new.children["fields"])
+        self.aspects_changed = "aspects" in changed
+        self.attrs_changed = "attrs" in changed
+        if "assets" in changed:
+            old_assets = old.children["assets"]
+            new_assets = new.children["assets"]
+            pairs, added, removed = _pair_assets(old_assets, new_assets)
+            self.added_assets = [self._named(new_assets, k) for k in added]
+            self.removed_assets = [self._named(old_assets, k) for k in removed]
+            self.changed_assets = {self._named(new_assets, new_k): AssetDiff(old_assets.children[old_k],
+                                                                             new_assets.children[new_k])
+                                   for old_k, new_k in pairs}
+
+    @staticmethod
+    def _named(assets, key):
+        return key, assets.children[key].label
+
+    def __bool__(self):
+        return (len(self.changed_fields) > 0 or self.aspects_changed or self.attrs_changed or
+                len(self.added_assets) > 0 or len(self.removed_assets) > 0 or len(self.changed_assets) > 0)
+
+
+def diff(old, new):
+    """
+    Compare two versions of a character. Characters are hashed in full,
+    pass previously built HashNode trees to only compare them.
+
+    :type old: Character | HashNode
+    :type new: Character | HashNode
+    :rtype: CharDiff
+    """
+    if not isinstance(old, HashNode):
+        old = hash_char(old)
+    if not isinstance(new, HashNode):
+        new = hash_char(new)
+    return CharDiff(old, new)
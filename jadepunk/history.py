@@ -0,0 +1,223 @@
+import uuid
+import weakref
+
+from . import Aspects, Attrs, Character
+from .hashing import diff, hash_char
+from .loader import build_asset, copy_asset, dump_asset_fields, dump_asset_props, dump_aspects, dump_attrs
+
+
+class Revision(Character):
+    """
+    An immutable version of a character. Edits return a new Revision which
+    shares every unchanged Aspects, Attrs and Asset with this one, so the
+    shared parts must never be modified in place. Every asset is given a
+    stable key, kept when it is edited or replaced, so it can be followed
+    between revisions.
+    Revisions are not validated when created, use character() for that.
+    """
+    def __init__(self,
+                 name,
+                 aspects,
+                 attrs,
+                 assets,
+                 background=None,
+                 max_refresh=7,
+                 new_gen=True,
+                 parent=None,
+                 message=None):
+        for k, v in [("name", name),
+                     ("aspects", aspects),
+                     ("attrs", attrs),
+                     ("assets", tuple(assets)),
+                     ("background", background),
+                     ("max_ref", max_refresh),
+                     ("new_gen", new_gen),
+                     ("parent", parent),
+                     ("message", message)]:
+            object.__setattr__(self, k, v)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Revisions are immutable, use evolve() to make a new one")
+
+    @classmethod
+    def from_character(cls, char, message=None):
+        """
+        Snapshot a character, copying its assets so later edits to it are not shared.
+
+        :type char: Character
+        :rtype: Revision
+        """
+        return cls(char.name,
+                   aspects=Aspects(**dump_aspects(char.aspects)),
+                   attrs=Attrs(**dump_attrs(char.attrs)),
+                   assets=[copy_asset(asset, key=asset.key or uuid.uuid4().hex) for asset in char.assets],
+                   background=char.background,
+                   max_refresh=char.max_ref,
+                   new_gen=char.new_gen,
+                   message=message)
+
+    def evolve(self, message=None, **changes):
+        """
+        Make a new revision with the given fields replaced, sharing everything else.
+
+        :param changes: Any of name, aspects, attrs, assets, background, max_refresh or new_gen
+        :rtype: Revision
+        """
+        fields = {"name": self.name,
+                  "aspects": self.aspects,
+                  "attrs": self.attrs,
+                  "assets": self.assets,
+                  "background": self.background,
+                  "max_refresh": self.max_ref,
+                  "new_gen": self.new_gen}
+        for k in changes:
+            if k not in fields:
+                raise TypeError("Unknown revision field {}".format(k))
+        fields.update(changes)
+        return Revision(parent=self, message=message, **fields)
+
+    def set_aspect(self, aspect, txt, message=None):
+        """
+        :type aspect: AspectTypes
+        :type txt: str
+        """
+        aspects = dump_aspects(self.aspects)
+        aspects[aspect.name.lower()] = txt
+        return self.evolve(message, aspects=Aspects(**aspects))
+
+    def set_attr(self, attr, rating, message=None):
+        """
+        :type attr: AttrTypes
+        :type rating: int
+        """
+        attrs = dump_attrs(self.attrs)
+        attrs[attr.name.lower()] = rating
+        return self.evolve(message, attrs=Attrs(**attrs))
+
+    def _asset_index(self, idx):
+        pos = idx + len(self.assets) if idx < 0 else idx
+        if not 0 <= pos < len(self.assets):
+            raise IndexError("Revision has no asset {}".format(idx))
+        return pos
+
+    def add_asset(self, asset, message=None):
+        if asset.key is None:
+            asset.key = uuid.uuid4().hex
+        return self.evolve(message, assets=self.assets + (asset,))
+
+    def remove_asset(self, idx, message=None):
+        idx = self._asset_index(idx)
+        return self.evolve(message, assets=self.assets[:idx] + self.assets[idx+1:])
+
+    def replace_asset(self, idx, asset, message=None):
+        idx = self._asset_index(idx)
+        if asset.key is None:
+            asset.key = self.assets[idx].key
+        return self.evolve(message, assets=self.assets[:idx] + (asset,) + self.assets[idx+1:])
+
+    def edit_asset(self, idx, message=None, **changes):
+        """
+        Rebuild a single asset with some of its loader fields changed, eg.
+        edit_asset(0, functional="Rusted Jade Revolvers", Harmful=2, Numerous=None).
+        Properties are given by class name, a value of None removes every
+        property of that class. Changing a class the asset has more than once
+        is ambiguous and raises ValueError, use replace_asset for that.
+
+        Every property of the edited asset is rebuilt, not just the changed
+        ones. A property holds a back-pointer to its asset (set by set_master),
+        and some (eg. Sturdy, Protective, Talented) derive state from it, so
+        sharing one between the old and new asset would re-parent it and
+        change the earlier revision. Sharing is therefore per asset: all the
+        other assets, and the Aspects and Attrs, are shared unchanged.
+        """
+        idx = self._asset_index(idx)
+        asset = self.assets[idx]
+        fields = dump_asset_fields(asset)
+        prop_items = dump_asset_props(asset)
+        for k, v in changes.items():
+            if not k[0].isupper():
+                fields[k] = v
+                continue
+            found = [i for i, (name, _) in enumerate(prop_items) if name == k]
+            if v is None:
+                prop_items = [item for item in prop_items if item[0] != k]
+            elif len(found) == 0:
+                prop_items.append((k, v))
+            elif len(found) == 1:
+                prop_items[found[0]] = (k, v)
+            else:
+                raise ValueError("Asset has {} {} properties, use replace_asset to change one".format(len(found), k))
+        return self.replace_asset(idx, build_asset(fields, prop_items), message)
+
+    def character(self, out=None):
+        """
+        Build a validated Character sharing this revision's parts.
+
+        :rtype: Character
+        """
+        return Character(self.name,
+                         aspects=self.aspects,
+                         attrs=self.attrs,
+                         assets=list(self.assets),
+                         background=self.background,
+                         max_refresh=self.max_ref,
+                         new_gen=self.new_gen,
+                         out=out)
+
+
+class History(object):
+    """
+    Every revision of a character sheet, oldest first.
+    """
+    def __init__(self, char, message=None):
+        """
+        :type char: Character
+        """
+        self.revisions = [char if isinstance(char, Revision) else Revision.from_character(char, message)]
+        self.hash_cache = weakref.WeakKeyDictionary()
+        self.trees = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return len(self.revisions)
+
+    @property
+    def head(self):
+        """
+        :rtype: Revision
+        """
+        return self.revisions[-1]
+
+    def commit(self, rev):
+        """
+        :type rev: Revision
+        :rtype: Revision
+        """
+        self.revisions.append(rev)
+        return rev
+
+    def checkout(self, idx):
+        """
+        :type idx: int
+        :rtype: Revision
+        """
+        return self.revisions[idx]
+
+    def tree(self, idx):
+        """
+        The hash tree of a revision. Each is built once, and only hashes the
+        assets which are not shared with an earlier revision.
+
+        :rtype: jadepunk.hashing.HashNode
+        """
+        rev = self.revisions[idx]
+        if rev not in self.trees:
+            self.trees[rev] = hash_char(rev, self.hash_cache)
+        return self.trees[rev]
+
+    def diff(self, old, new):
+        """
+        Compare two revisions by index.
+
+        :rtype: jadepunk.hashing.CharDiff
+        """
+        return diff(self.tree(old), self.tree(new))
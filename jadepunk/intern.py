@@ -0,0 +1,93 @@
+import sys
+import weakref
+
+from .loader import copy_asset, dump_asset_fields, dump_asset_props, make_asset, non_props, props
+
+
+class Interner(object):
+    """
+    Shares structurally identical assets between characters.
+
+    Shared assets must be treated as immutable, use cow() to get a private
+    copy of a character's asset before editing it.
+    """
+    def __init__(self):
+        self.assets = weakref.WeakValueDictionary()
+        self.shared = weakref.WeakSet()
+
+    @staticmethod
+    def string(txt):
+        return sys.intern(txt) if isinstance(txt, str) else txt
+
+    def data(self, value):
+        """
+        Intern every string within a loaded data structure.
+        """
+        if isinstance(value, dict):
+            return {self.string(k): self.data(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.data(v) for v in value]
+        return self.string(value)
+
+    def key(self, value):
+        """
+        A hashable key for a data structure, ignoring the order of mapping keys.
+        """
+        if isinstance(value, dict):
+            return tuple(sorted([(k, self.key(v)) for k, v in value.items() if v is not None],
+                                key=lambda kv: kv[0]))
+        if isinstance(value, list):
+            return ("list",) + tuple([self.key(v) for v in value])
+        return value
+
+    def asset_key(self, fields, prop_items):
+        """
+        A key for an asset's fields and (class name, args) property pairs.
+        The order of the properties is part of the key, as it is the order
+        they are rendered in, the order of the other fields is not.
+        """
+        return (self.key(fields),
+                tuple([(k, self.key(v)) for k, v in prop_items]))
+
+    def asset_data(self, data):
+        """
+        :type data: dict
+        :rtype: Asset
+        """
+        data = self.data(data)
+        key = self.asset_key(non_props(data), props(data).items())
+        asset = self.assets.get(key)
+        if asset is None:
+            asset = self.asset(make_asset(data))
+            self.assets[key] = asset
+        return asset
+
+    def asset(self, asset):
+        """
+        :type asset: Asset
+        :rtype: Asset
+        """
+        key = self.asset_key(self.data(dump_asset_fields(asset)),
+                             [(k, self.data(v)) for k, v in dump_asset_props(asset)])
+        canonical = self.assets.get(key)
+        if canonical is None:
+            self.assets[key] = canonical = asset
+            self.shared.add(asset)
+        return canonical
+
+    def is_shared(self, asset):
+        return asset in self.shared
+
+    def cow(self, char, idx):
+        """
+        Give a character its own copy of an asset so that it can be edited.
+
+        :type char: Character
+        :type idx: int
+        :rtype: Asset
+        """
+        asset = char.assets[idx]
+        if self.is_shared(asset):
+            asset = copy_asset(asset)
+            char.assets[idx] = asset
+        return asset
@@ -1,9 +1,18 @@
+import collections.abc
+import functools
+import io
+import json
+import multiprocessing
+import os
+import queue
 import sys
+import threading
 
 import yaml
 
 from . import Aspects, AspectTypes, Asset, AssetTypes, Attrs, AttrTypes, Character
-from .engine import EngineLoader
+from .engine import EngineLoader, default_registry
+from .sinks import SINKS
 
 
 def get_prop_class(name):
@@ -33,40 +42,399 @@ def make_prop(name, args):
         return cls(args)
 
 
-def from_yaml(yml_path, engine):
-    def load_type(enum, tag):
-        def load(loader, node):
-            return enum[loader.construct_scalar(node)]
-        yaml.add_constructor(tag, load)
-    load_type(AspectTypes, "!Aspect")
-    load_type(AssetTypes, "!Asset")
-    load_type(AttrTypes, "!Attr")
+ENUM_TAGS = {"!Aspect": AspectTypes,
+             "!Asset": AssetTypes,
+             "!Attr": AttrTypes}
 
-    with open(yml_path) as yml:
-        char_data = yaml.load(yml)
-
-    char_aspects = Aspects(**char_data['aspects'])
-    char_attrs = Attrs(**char_data['attrs'])
-    char_assets = []
-    for asset in char_data['assets']:
-        features = []
-        flaws = []
-        for key in props(asset):
-            prop = make_prop(key, asset[key])
-            if isinstance(prop, Asset.Feature):
-                features.append(prop)
-            else:
-                flaws.append(prop)
-        char_assets.append(Asset(features=features,
-                                 flaws=flaws,
-                                 **non_props(asset)))
+
+def build_asset(fields, prop_items):
+    """
+    :type fields: dict
+    :param prop_items: Ordered (class name, args) pairs, which may repeat a class
+    :rtype: Asset
+    """
+    features = []
+    flaws = []
+    for name, args in prop_items:
+        prop = make_prop(name, args)
+        if isinstance(prop, Asset.Feature):
+            features.append(prop)
+        else:
+            flaws.append(prop)
+    return Asset(features=features,
+                 flaws=flaws,
+                 **fields)
+
+
+def make_asset(data):
+    return build_asset(non_props(data), props(data).items())
+
+
+def make_char(char_data, interner=None, out=None):
+    """
+    :type char_data: dict
+    :type interner: jadepunk.intern.Interner
+    :param interner: If given, assets and strings are shared with other characters built using it
+    :param out: File to write validation messages to, defaults to sys.stdout
+    :rtype: Character
+    """
+    build_asset = make_asset
+    if interner is not None:
+        char_data = interner.data(char_data)
+        build_asset = interner.asset_data
     char_params = {k: v for k, v in char_data.items() if k not in ['aspects', 'attrs', 'assets']}
-    Character(aspects=char_aspects,
-              attrs=char_attrs,
-              assets=char_assets,
-              **char_params).render(engine)
+    return Character(aspects=Aspects(**char_data['aspects']),
+                     attrs=Attrs(**char_data['attrs']),
+                     assets=[build_asset(asset) for asset in char_data['assets']],
+                     out=out,
+                     **char_params)
+
+
+def dump_prop(prop):
+    args = prop.params()
+    if isinstance(prop, Asset.Talented):
+        inner = args.pop("prop")
+        args[inner.name()] = dump_prop(inner)
+    return args
+
+
+def dump_asset_fields(asset):
+    data = {"a_type": asset.type,
+            "name": asset.raw_name,
+            "functional": asset.functional,
+            "guiding": asset.guiding,
+            "mastercrafted": asset.mastercrafted,
+            "gm_approved": asset.silence_gm}
+    if asset.key is not None:
+        data["key"] = asset.key
+    return data
+
+
+def dump_asset_props(asset):
+    """
+    :return: The (class name, args) of each property, in order
+    :rtype: list
+    """
+    return [(prop.name(), dump_prop(prop)) for prop in asset.properties]
+
+
+def dump_asset(asset):
+    """
+    Dump an asset in the loader's mapping layout. Properties are keyed by
+    class name, so only the last of any repeated class is kept, use
+    dump_asset_fields and dump_asset_props where that matters.
+    """
+    data = dump_asset_fields(asset)
+    data.update(dump_asset_props(asset))
+    return data
+
+
+def copy_asset(asset, **fields):
+    """
+    Build a new, unshared copy of an asset, optionally with some of its fields changed.
+
+    :rtype: Asset
+    """
+    return build_asset(dict(dump_asset_fields(asset), **fields), dump_asset_props(asset))
+
+
+def dump_aspects(aspects):
+    return {asp.name.lower(): val for asp, val in aspects.aspects.items()}
+
+
+def dump_attrs(attrs):
+    return {attr.name.lower(): val for attr, val in attrs.attrs.items()}
+
+
+def dump_char(char):
+    return {"name": char.name,
+            "background": char.background,
+            "max_refresh": char.max_ref,
+            "new_gen": char.new_gen,
+            "aspects": dump_aspects(char.aspects),
+            "attrs": dump_attrs(char.attrs),
+            "assets": [dump_asset(asset) for asset in char.assets]}
+
+
+def json_default(obj):
+    for tag, enum in ENUM_TAGS.items():
+        if isinstance(obj, enum):
+            return {tag: obj.name}
+    raise TypeError("{} is not JSON serializable".format(type(obj).__name__))
+
+
+def json_object_hook(obj):
+    if len(obj) == 1:
+        tag, val = next(iter(obj.items()))
+        if tag in ENUM_TAGS:
+            return ENUM_TAGS[tag][val]
+    return obj
+
+
+class LazyAssets(collections.abc.Sequence):
+    """
+    A read only list of assets which only builds each Asset on first access.
+    """
+    def __init__(self, keys, build):
+        self.keys = keys
+        self.build = build
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        pos = idx + len(self) if idx < 0 else idx
+        if not 0 <= pos < len(self):
+            raise IndexError("Asset index {} out of range".format(idx))
+        idx = pos
+        if idx not in self.cache:
+            self.cache[idx] = self.build(self.keys[idx])
+        return self.cache[idx]
+
+
+class LazyCharacter(object):
+    """
+    A character which keeps its loaded data and only builds the Aspects,
+    Attrs or an individual Asset the first time each is used.
+    """
+    def __init__(self, char_data, interner=None):
+        """
+        :type char_data: dict
+        :type interner: jadepunk.intern.Interner
+        """
+        if interner is not None:
+            char_data = interner.data(char_data)
+        self.data = char_data
+        self.name = char_data['name']
+        self.background = char_data.get('background')
+        self.max_ref = char_data.get('max_refresh', 7)
+        self.new_gen = char_data.get('new_gen', True)
+        self._aspects = None
+        self._attrs = None
+        self._refresh = None
+        self.assets = LazyAssets(char_data['assets'],
+                                 interner.asset_data if interner is not None else make_asset)
+
+    @property
+    def aspects(self):
+        if self._aspects is None:
+            self._aspects = Aspects(**self.data['aspects'])
+        return self._aspects
+
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            self._attrs = Attrs(**self.data['attrs'])
+        return self._attrs
+
+    def refresh(self):
+        if self._refresh is None:
+            # Assets not yet used are built only to be costed, not kept
+            cache = self.assets.cache
+            self._refresh = self.max_ref - sum([(cache[i] if i in cache else self.assets.build(key)).refresh()
+                                                for i, key in enumerate(self.assets.keys)])
+        return self._refresh
+
+    def hydrate(self, out=None):
+        """
+        Build a full, validated Character, reusing any parts already built.
+
+        :rtype: Character
+        """
+        return Character(self.name,
+                         aspects=self.aspects,
+                         attrs=self.attrs,
+                         assets=list(self.assets),
+                         background=self.background,
+                         max_refresh=self.max_ref,
+                         new_gen=self.new_gen,
+                         out=out)
+
+
+class CharYamlLoader(yaml.SafeLoader):
+    """
+    A YAML loader understanding the !Aspect, !Asset and !Attr tags.
+    The tags are registered on this class alone, leaving PyYAML's own loaders untouched.
+    """
+    pass
+
+
+def _enum_constructor(enum):
+    def load(loader, node):
+        return enum[loader.construct_scalar(node)]
+    return load
+
+
+for _tag, _enum in ENUM_TAGS.items():
+    CharYamlLoader.add_constructor(_tag, _enum_constructor(_enum))
+
+
+def read_yaml(yml_path):
+    with open(yml_path) as yml:
+        return yaml.load(yml, Loader=CharYamlLoader)
+
+
+def load_yaml(yml_path, interner=None, out=None):
+    return make_char(read_yaml(yml_path), interner, out)
+
+
+def load_yaml_lazy(yml_path, interner=None):
+    """
+    :rtype: LazyCharacter
+    """
+    return LazyCharacter(read_yaml(yml_path), interner)
+
+
+def from_yaml(yml_path, engine, interner=None):
+    load_yaml(yml_path, interner, engine.out).render(engine)
+
+
+class RenderContext(object):
+    """
+    Renders char sheets to strings using a single engine.
+    Each render writes to its own buffer, so a context can be shared between threads.
+    """
+    def __init__(self, engine, registry=None, interner=None):
+        """
+        :type engine: str
+        :type registry: EngineRegistry
+        :type interner: jadepunk.intern.Interner
+        """
+        self.engine = engine
+        self.registry = registry if registry is not None else default_registry
+        self.interner = interner
+        self.ext = self.registry.engines[engine].EXT
+
+    def render(self, char):
+        """
+        :type char: Character
+        :rtype: str
+        """
+        buf = io.StringIO()
+        char.render(self.registry.get(self.engine, buf))
+        return buf.getvalue()
+
+    def render_yaml(self, yml_path):
+        """
+        Render a char sheet, along with any validation messages, to a string.
+
+        :rtype: str
+        """
+        buf = io.StringIO()
+        from_yaml(yml_path, self.registry.get(self.engine, buf), self.interner)
+        return buf.getvalue()
+
+
+def render_record(engine, line):
+    """
+    Render one JSON encoded character record to a result frame.
+    Enum values in the record are written as single key objects, eg. {"!Attr": "SCHOLAR"}.
+
+    :type engine: str
+    :type line: bytes | str
+    :rtype: dict
+    """
+    try:
+        char = make_char(json.loads(line, object_hook=json_object_hook), out=io.StringIO())
+        frame = {"ok": True,
+                 "name": char.name,
+                 "output": RenderContext(engine).render(char),
+                 "diagnostics": [{"level": lv.value, "text": txt} for lv, txt in char.val_log]}
+    except Exception as e:
+        frame = {"ok": False,
+                 "error": "{}: {}".format(type(e).__name__, e)}
+    return frame
+
+
+def pipe(engine, inp, out, workers=0, max_pending=None):
+    """
+    Render newline delimited JSON records from inp, writing one result frame
+    per line to out in the same order as the input.
+
+    :type engine: str
+    :param inp: A binary or text file, eg. sys.stdin.buffer
+    :type workers: int
+    :param workers: Number of worker processes, 0 renders in this process
+    :type max_pending: int
+    :param max_pending: Most records being rendered at once, defaults to 4 per worker
+    """
+    records = (line for line in inp if line.strip())
+    render = functools.partial(render_record, engine)
+    if workers > 0:
+        with multiprocessing.Pool(workers) as pool:
+            _write_frames(_bounded_map(pool, render, records, max_pending or workers * 4), out)
+    else:
+        _write_frames(map(render, records), out)
+
+
+def _bounded_map(pool, func, items, max_pending):
+    """
+    Like pool.imap, but only reads ahead far enough to keep max_pending items in flight.
+    Items are read on a separate thread, so results are still returned while waiting for input.
+    If reading the items fails, the error is raised after the results of the items already read.
+    """
+    slots = threading.BoundedSemaphore(max_pending)
+    pending = queue.Queue()
+    failed = []
+
+    def submit():
+        try:
+            for item in items:
+                slots.acquire()
+                pending.put(pool.apply_async(func, (item,)))
+        except BaseException as e:
+            failed.append(e)
+        finally:
+            pending.put(None)
+
+    reader = threading.Thread(target=submit, daemon=True)
+    reader.start()
+    while True:
+        result = pending.get()
+        if result is None:
+            break
+        value = result.get()
+        slots.release()
+        yield value
+    reader.join()
+    if len(failed) > 0:
+        raise failed[0]
+
+
+def _write_frames(frames, out):
+    for seq, frame in enumerate(frames):
+        out.write(json.dumps(dict(seq=seq, **frame)) + "\n")
+        out.flush()
+
+
+def to_sink(yml_paths, ctx, sink):
+    """
+    Render a batch of char sheets into a single output sink. Each entry is
+    named by the sheet's path relative to the directory common to them all,
+    so sheets with the same file name in different directories are kept apart.
+
+    :type ctx: RenderContext
+    """
+    yml_paths = [os.path.abspath(yml_path) for yml_path in yml_paths]
+    root = os.path.commonpath([os.path.dirname(yml_path) for yml_path in yml_paths]) if yml_paths else None
+    names = set()
+    with sink:
+        for yml_path in yml_paths:
+            name = os.path.splitext(os.path.relpath(yml_path, root))[0].replace(os.sep, "/") + ctx.ext
+            if name in names:
+                raise ValueError("Duplicate entry {} for {}".format(name, yml_path))
+            names.add(name)
+            sink.write(name, ctx.render_yaml(yml_path))
 
 
 if __name__ == "__main__":
     if sys.argv[1] in ["yml", "yaml"]:
         from_yaml(sys.argv[2], EngineLoader(sys.argv[3]))
+    elif sys.argv[1] in SINKS:
+        from .intern import Interner
+        to_sink(sys.argv[4:], RenderContext(sys.argv[2], interner=Interner()), SINKS[sys.argv[1]](sys.argv[3]))
+    elif sys.argv[1] == "ndjson":
+        pipe(sys.argv[2], sys.stdin.buffer, sys.stdout, int(sys.argv[3]) if len(sys.argv) > 3 else 0)
@@ -0,0 +1,173 @@
+import bisect
+import itertools
+
+from .assets import Asset
+
+
+class Roster(object):
+    # Property attributes with their own by_prop entries, so with_prop can look them up directly
+    INDEXED_FIELDS = ("attr", "ranks")
+
+    def __init__(self, chars=()):
+        self.chars = {}
+        self.by_attr = {}
+        self.by_asset_type = {}
+        self.by_prop = {}
+        self.by_refresh = {}
+        self.refresh_keys = []
+        self._entries = {}
+        for char in chars:
+            self.add(char)
+
+    def __len__(self):
+        return len(self.chars)
+
+    def __iter__(self):
+        return iter(self.chars.values())
+
+    def __contains__(self, char):
+        return id(char) in self.chars
+
+    @staticmethod
+    def _prop_classes(prop):
+        return [cls for cls in type(prop).__mro__
+                if isinstance(cls, type) and issubclass(cls, Asset.Prop)]
+
+    @staticmethod
+    def _asset_props(asset):
+        """
+        Every property of an asset, including those granted through Talented.
+        """
+        for prop in asset.properties:
+            yield prop
+            if isinstance(prop, Asset.Talented):
+                yield prop.prop
+
+    @classmethod
+    def _prop_fields(cls, prop):
+        """
+        Every combination of the indexed attributes the property has, as tuples of (name, value) pairs.
+        """
+        fields = [(k, getattr(prop, k)) for k in cls.INDEXED_FIELDS if hasattr(prop, k)]
+        return [combo for n in range(len(fields) + 1) for combo in itertools.combinations(fields, n)]
+
+    def _index_keys(self, char):
+        keys = []
+        for attr, rating in char.attrs.attrs.items():
+            keys.append((self.by_attr, (attr, rating)))
+        for asset in char.assets:
+            keys.append((self.by_asset_type, asset.type))
+            for prop in self._asset_props(asset):
+                fields = self._prop_fields(prop)
+                for cls in self._prop_classes(prop):
+                    for a_type in (None, asset.type):
+                        keys.extend([(self.by_prop, (cls, a_type, f)) for f in fields])
+        keys.append((self.by_refresh, char.refresh()))
+        return keys
+
+    def _link(self, index, key, char):
+        if key not in index:
+            index[key] = {}
+            if index is self.by_refresh:
+                bisect.insort(self.refresh_keys, key)
+        index[key][id(char)] = char
+
+    def _unlink(self, index, key, char):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(id(char), None)
+        if len(bucket) == 0:
+            del index[key]
+            if index is self.by_refresh:
+                self.refresh_keys.remove(key)
+
+    def add(self, char):
+        if char in self:
+            self.update(char)
+            return
+        self.chars[id(char)] = char
+        self._entries[id(char)] = self._index_keys(char)
+        for index, key in self._entries[id(char)]:
+            self._link(index, key, char)
+
+    def remove(self, char):
+        for index, key in self._entries.pop(id(char)):
+            self._unlink(index, key, char)
+        del self.chars[id(char)]
+
+    def update(self, char):
+        """
+        Re-index a character that has been changed since it was added.
+        Only the index entries that differ from the previous ones are touched.
+        """
+        old = self._entries[id(char)]
+        new = self._index_keys(char)
+        old_set = {(id(index), key) for index, key in old}
+        new_set = {(id(index), key) for index, key in new}
+        for index, key in old:
+            if (id(index), key) not in new_set:
+                self._unlink(index, key, char)
+        for index, key in new:
+            if (id(index), key) not in old_set:
+                self._link(index, key, char)
+        self._entries[id(char)] = new
+
+    def with_attr(self, attr, rating):
+        """
+        :type attr: AttrTypes
+        :type rating: int
+        :rtype: list
+        """
+        return list(self.by_attr.get((attr, rating), {}).values())
+
+    def with_asset_type(self, a_type):
+        """
+        :type a_type: AssetTypes
+        :rtype: list
+        """
+        return list(self.by_asset_type.get(a_type, {}).values())
+
+    def with_prop(self, prop_cls, a_type=None, **match):
+        """
+        Find characters with an asset having a property of the given class,
+        either directly or through Talented.
+        Any extra keyword arguments must match attributes of the property,
+        eg. with_prop(Asset.Focus, attr=AttrTypes.SCHOLAR). Matches on the
+        asset type, attr and ranks are index lookups, any others scan the
+        assets of the characters found that way.
+
+        :type prop_cls: type
+        :type a_type: AssetTypes
+        :rtype: list
+        """
+        indexed = tuple([(k, match[k]) for k in self.INDEXED_FIELDS if k in match])
+        rest = {k: v for k, v in match.items() if k not in self.INDEXED_FIELDS}
+        candidates = self.by_prop.get((prop_cls, a_type, indexed), {})
+        if len(rest) == 0:
+            return list(candidates.values())
+
+        def matches(asset):
+            if a_type is not None and asset.type != a_type:
+                return False
+            return any([isinstance(p, prop_cls) and
+                        all([getattr(p, k, None) == v for k, v in match.items()])
+                        for p in self._asset_props(asset)])
+
+        return [c for c in candidates.values()
+                if any([matches(asset) for asset in c.assets])]
+
+    def with_refresh(self, low=None, high=None):
+        """
+        Find characters whose remaining refresh lies within [low, high].
+
+        :type low: int
+        :type high: int
+        :rtype: list
+        """
+        start = 0 if low is None else bisect.bisect_left(self.refresh_keys, low)
+        end = len(self.refresh_keys) if high is None else bisect.bisect_right(self.refresh_keys, high)
+        found = {}
+        for key in self.refresh_keys[start:end]:
+            found.update(self.by_refresh[key])
+        return list(found.values())
@@ -0,0 +1,105 @@
+import gzip
+import io
+import json
+import tarfile
+import time
+import zipfile
+
+BUFFER_SIZE = 1 << 20
+
+
+class Sink(object):
+    """
+    Collects many rendered documents into a single output file.
+    """
+    def __init__(self, path, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self.out = open(path, "wb", buffering=buffer_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def write(self, name, text):
+        raise NotImplementedError()
+
+    def close(self):
+        self.out.close()
+
+
+class ZipSink(Sink):
+    def __init__(self, path, compress=True, buffer_size=BUFFER_SIZE):
+        super().__init__(path, buffer_size)
+        self.archive = zipfile.ZipFile(self.out, "w",
+                                       compression=zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+
+    def write(self, name, text):
+        self.archive.writestr(name, text.encode("utf-8"))
+
+    def close(self):
+        self.archive.close()
+        super().close()
+
+
+class TarSink(Sink):
+    EXTENSIONS = {".tar.gz": "gz",
+                  ".tgz": "gz",
+                  ".tar.bz2": "bz2",
+                  ".tbz2": "bz2",
+                  ".tar.xz": "xz",
+                  ".txz": "xz"}
+
+    def __init__(self, path, compression=None, buffer_size=BUFFER_SIZE):
+        """
+        :type compression: str
+        :param compression: One of "", "gz", "bz2" or "xz", by default chosen from the file extension
+        """
+        if compression is None:
+            compression = next((c for ext, c in self.EXTENSIONS.items() if path.endswith(ext)), "")
+        super().__init__(path, buffer_size)
+        self.archive = tarfile.open(fileobj=self.out, mode="w|{}".format(compression))
+
+    def write(self, name, text):
+        data = text.encode("utf-8")
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = time.time()
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+        super().close()
+
+
+class ConcatSink(Sink):
+    """
+    Writes every document into one file, and a JSON manifest of the name,
+    offset and length of each document into a separate file (by default
+    the same path with .json appended). Offsets are into the uncompressed stream.
+    """
+    def __init__(self, path, manifest=None, compress=False, buffer_size=BUFFER_SIZE):
+        super().__init__(path, buffer_size)
+        self.manifest_path = manifest if manifest is not None else path + ".json"
+        self.stream = gzip.GzipFile(fileobj=self.out, mode="wb") if compress else self.out
+        self.offset = 0
+        self.manifest = []
+
+    def write(self, name, text):
+        data = text.encode("utf-8")
+        self.stream.write(data)
+        self.manifest.append({"name": name, "offset": self.offset, "length": len(data)})
+        self.offset += len(data)
+
+    def close(self):
+        if self.stream is not self.out:
+            self.stream.close()
+        super().close()
+        with open(self.manifest_path, "w") as manifest:
+            json.dump(self.manifest, manifest, indent=2)
+
+
+SINKS = {"zip": ZipSink,
+         "tar": TarSink,
+         "concat": ConcatSink}
@@ -0,0 +1,309 @@
+import json
+import sqlite3
+
+from . import Aspects, AspectTypes, Asset, AssetTypes, Attrs, AttrTypes, Character
+from .loader import LazyAssets, json_default, json_object_hook, make_prop
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    background TEXT,
+    max_refresh INTEGER NOT NULL,
+    new_gen INTEGER NOT NULL,
+    refresh INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS characters_refresh ON characters (refresh);
+CREATE INDEX IF NOT EXISTS characters_name ON characters (name);
+
+CREATE TABLE IF NOT EXISTS aspects (
+    char_id INTEGER NOT NULL REFERENCES characters (id) ON DELETE CASCADE,
+    aspect TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (char_id, aspect)
+);
+
+CREATE TABLE IF NOT EXISTS attrs (
+    char_id INTEGER NOT NULL REFERENCES characters (id) ON DELETE CASCADE,
+    attr TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    PRIMARY KEY (char_id, attr)
+);
+CREATE INDEX IF NOT EXISTS attrs_rating ON attrs (attr, rating);
+
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    char_id INTEGER NOT NULL REFERENCES characters (id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    a_type TEXT NOT NULL,
+    name TEXT,
+    functional TEXT,
+    guiding TEXT,
+    mastercrafted INTEGER NOT NULL,
+    gm_approved INTEGER NOT NULL,
+    refresh INTEGER NOT NULL,
+    key TEXT
+);
+CREATE INDEX IF NOT EXISTS assets_char ON assets (char_id, pos);
+CREATE INDEX IF NOT EXISTS assets_type ON assets (a_type);
+CREATE INDEX IF NOT EXISTS assets_refresh ON assets (refresh);
+
+CREATE TABLE IF NOT EXISTS props (
+    id INTEGER PRIMARY KEY,
+    asset_id INTEGER NOT NULL REFERENCES assets (id) ON DELETE CASCADE,
+    parent_id INTEGER REFERENCES props (id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    cls TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    args TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS props_asset ON props (asset_id, pos);
+CREATE INDEX IF NOT EXISTS props_cls ON props (cls);
+"""
+
+
+class StoredCharacter(object):
+    def __init__(self, store, row):
+        self.store = store
+        self.id, self.name, self.background, self.max_ref, new_gen, self.stored_refresh = row
+        self.new_gen = bool(new_gen)
+        self._aspects = None
+        self._attrs = None
+        self._assets = None
+
+    @property
+    def aspects(self):
+        if self._aspects is None:
+            self._aspects = self.store.load_aspects(self.id)
+        return self._aspects
+
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            self._attrs = self.store.load_attrs(self.id)
+        return self._attrs
+
+    @property
+    def assets(self):
+        if self._assets is None:
+            self._assets = LazyAssets(self.store.asset_ids(self.id), self.store.load_asset)
+        return self._assets
+
+    def refresh(self):
+        return self.stored_refresh
+
+    def hydrate(self, out=None):
+        """
+        Build a full, validated Character from the stored data.
+
+        :rtype: Character
+        """
+        return Character(self.name,
+                         aspects=self.aspects,
+                         attrs=self.attrs,
+                         assets=list(self.assets),
+                         background=self.background,
+                         max_refresh=self.max_ref,
+                         new_gen=self.new_gen,
+                         out=out)
+
+
+class CharacterStore(object):
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _next_id(self, table):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM {}".format(table)).fetchone()[0]
+
+    @staticmethod
+    def _prop_rows(prop, prop_id, asset_id, parent_id, pos):
+        args = prop.params()
+        if isinstance(prop, Asset.Talented):
+            args = {"a_type": args["a_type"]}
+        kind = "Feature" if isinstance(prop, Asset.Feature) else "Flaw"
+        return (prop_id, asset_id, parent_id, pos, prop.name(), kind,
+                json.dumps(args, default=json_default))
+
+    def add(self, char):
+        return self.add_many([char])[0]
+
+    def add_many(self, chars, batch_size=500):
+        """
+        Insert characters in batches, each batch within a single transaction.
+
+        :type chars: collections.abc.Iterable
+        :type batch_size: int
+        :return: The ids of the inserted characters
+        :rtype: list
+        """
+        ids = []
+        batch = []
+        for char in chars:
+            batch.append(char)
+            if len(batch) >= batch_size:
+                ids.extend(self._insert_batch(batch))
+                batch = []
+        if len(batch) > 0:
+            ids.extend(self._insert_batch(batch))
+        return ids
+
+    def _insert_batch(self, chars):
+        char_rows = []
+        aspect_rows = []
+        attr_rows = []
+        asset_rows = []
+        prop_rows = []
+        with self.conn:
+            # Take the write lock before reading the next ids, so that other
+            # writers to the same database cannot allocate the same ones
+            self.conn.execute("BEGIN IMMEDIATE")
+            char_id = self._next_id("characters")
+            asset_id = self._next_id("assets")
+            prop_id = self._next_id("props")
+            ids = []
+            for char in chars:
+                ids.append(char_id)
+                char_rows.append((char_id, char.name, char.background, char.max_ref,
+                                  int(char.new_gen), char.refresh()))
+                aspect_rows.extend([(char_id, asp.name, val) for asp, val in char.aspects.aspects.items()])
+                attr_rows.extend([(char_id, attr.name, val) for attr, val in char.attrs.attrs.items()])
+                for pos, asset in enumerate(char.assets):
+                    asset_rows.append((asset_id, char_id, pos, asset.type.name, asset.raw_name,
+                                       asset.functional, asset.guiding, int(asset.mastercrafted),
+                                       int(asset.silence_gm), asset.refresh(), asset.key))
+                    for p_pos, prop in enumerate(asset.properties):
+                        prop_rows.append(self._prop_rows(prop, prop_id, asset_id, None, p_pos))
+                        if isinstance(prop, Asset.Talented):
+                            prop_rows.append(self._prop_rows(prop.prop, prop_id + 1, asset_id, prop_id, 0))
+                            prop_id += 1
+                        prop_id += 1
+                    asset_id += 1
+                char_id += 1
+            self.conn.executemany("INSERT INTO characters VALUES (?, ?, ?, ?, ?, ?)", char_rows)
+            self.conn.executemany("INSERT INTO aspects VALUES (?, ?, ?)", aspect_rows)
+            self.conn.executemany("INSERT INTO attrs VALUES (?, ?, ?)", attr_rows)
+            self.conn.executemany("INSERT INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", asset_rows)
+            self.conn.executemany("INSERT INTO props VALUES (?, ?, ?, ?, ?, ?, ?)", prop_rows)
+        return ids
+
+    def delete(self, char_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM characters WHERE id = ?", (char_id,))
+
+    def get(self, char_id):
+        """
+        :rtype: StoredCharacter
+        """
+        row = self.conn.execute("SELECT * FROM characters WHERE id = ?", (char_id,)).fetchone()
+        if row is None:
+            raise KeyError(char_id)
+        return StoredCharacter(self, row)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
+
+    def find(self,
+             name=None,
+             attrs=None,
+             asset_type=None,
+             prop=None,
+             refresh_low=None,
+             refresh_high=None):
+        """
+        Query characters using the indexed columns.
+
+        :type name: str
+        :type attrs: dict
+        :param attrs: Mapping of AttrTypes to required ratings
+        :type asset_type: AssetTypes
+        :type prop: type
+        :param prop: An Asset property class, Asset.Feature or Asset.Flaw, including those granted through Talented
+        :type refresh_low: int
+        :type refresh_high: int
+        :rtype: list
+        """
+        where = []
+        args = []
+        if name is not None:
+            where.append("name = ?")
+            args.append(name)
+        for attr, rating in (attrs or {}).items():
+            where.append("EXISTS (SELECT 1 FROM attrs WHERE char_id = characters.id AND attr = ? AND rating = ?)")
+            args.extend([attr.name, rating])
+        if asset_type is not None:
+            where.append("EXISTS (SELECT 1 FROM assets WHERE char_id = characters.id AND a_type = ?)")
+            args.append(asset_type.name)
+        if prop is not None:
+            column = "kind" if prop in [Asset.Feature, Asset.Flaw] else "cls"
+            # Properties granted through Talented are stored as child rows of the same asset
+            where.append("EXISTS (SELECT 1 FROM props JOIN assets ON props.asset_id = assets.id "
+                         "WHERE assets.char_id = characters.id AND props.{} = ?)".format(column))
+            args.append(prop.__name__)
+        if refresh_low is not None:
+            where.append("refresh >= ?")
+            args.append(refresh_low)
+        if refresh_high is not None:
+            where.append("refresh <= ?")
+            args.append(refresh_high)
+        sql = "SELECT * FROM characters"
+        if len(where) > 0:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        return [StoredCharacter(self, row) for row in self.conn.execute(sql, args)]
+
+    def asset_ids(self, char_id):
+        return [r[0] for r in self.conn.execute("SELECT id FROM assets WHERE char_id = ? ORDER BY pos",
+                                                (char_id,))]
+
+    def load_aspects(self, char_id):
+        rows = self.conn.execute("SELECT aspect, value FROM aspects WHERE char_id = ?", (char_id,))
+        return Aspects(**{AspectTypes[asp].name.lower(): val for asp, val in rows})
+
+    def load_attrs(self, char_id):
+        rows = self.conn.execute("SELECT attr, rating FROM attrs WHERE char_id = ?", (char_id,))
+        return Attrs(**{AttrTypes[attr].name.lower(): val for attr, val in rows})
+
+    def load_asset(self, asset_id):
+        """
+        :rtype: Asset
+        """
+        row = self.conn.execute("SELECT a_type, name, functional, guiding, mastercrafted, gm_approved, key "
+                                "FROM assets WHERE id = ?", (asset_id,)).fetchone()
+        a_type, name, functional, guiding, mastercrafted, gm_approved, key = row
+        rows = self.conn.execute("SELECT id, parent_id, cls, args FROM props WHERE asset_id = ? ORDER BY pos",
+                                 (asset_id,)).fetchall()
+        nested = {parent: (cls, args) for _, parent, cls, args in rows if parent is not None}
+        features = []
+        flaws = []
+        for p_id, parent, cls, args in rows:
+            if parent is not None:
+                continue
+            args = json.loads(args, object_hook=json_object_hook)
+            if p_id in nested:
+                inner_cls, inner_args = nested[p_id]
+                args[inner_cls] = json.loads(inner_args, object_hook=json_object_hook)
+            prop = make_prop(cls, args)
+            if isinstance(prop, Asset.Feature):
+                features.append(prop)
+            else:
+                flaws.append(prop)
+        return Asset(AssetTypes[a_type],
+                     features=features,
+                     flaws=flaws,
+                     functional=functional,
+                     guiding=guiding,
+                     name=name,
+                     mastercrafted=bool(mastercrafted),
+                     gm_approved=bool(gm_approved),
+                     key=key)
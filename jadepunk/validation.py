@@ -6,9 +6,10 @@ class Validator(object):
         WARN = "Warning"
         ERR = "Error"
 
-    def __init__(self, new_char):
+    def __init__(self, new_char, out=None):
         self.val_log = []
         self.new_char = new_char
+        self.out = out
 
     def _log(self, lv, txt):
         self.val_log.append((lv, txt))
@@ -21,9 +22,9 @@ class Validator(object):
 
     def check(self):
         for lv, txt in self.val_log:
-            print("{}: {}".format(lv.value, txt))
+            print("{}: {}".format(lv.value, txt), file=self.out)
         if any([lv == self.ErrorLevels.ERR for lv, txt in self.val_log]):
-            print("\n==============INVALID CHAR==============\n")
+            print("\n==============INVALID CHAR==============\n", file=self.out)
 
     def clear(self):
         self.val_log = []
@@ -0,0 +1,49 @@
+import io
+import unittest
+
+from jadepunk import Aspects, Asset, AssetTypes, Attrs, Character
+from jadepunk.history import History
+from jadepunk.loader import dump_asset_fields, dump_asset_props
+
+
+def make_char():
+    return Character("Tester",
+                     aspects=Aspects(portrayal="a", background="b", inciting_incident="c",
+                                     belief="d", trouble="e"),
+                     attrs=Attrs(aristocrat=3, engineer=0, explorer=1,
+                                 fighter=2, scholar=2, scoundrel=1),
+                     assets=[Asset(AssetTypes.DEVICE,
+                                   name="Bell",
+                                   functional="A brass bell",
+                                   features=[Asset.Aspect("Loud"), Asset.Aspect("Shiny")],
+                                   flaws=[Asset.Limited(1)])],
+                     out=io.StringIO())
+
+
+def asset_data(asset):
+    fields = dump_asset_fields(asset)
+    fields.pop("key", None)
+    return fields, dump_asset_props(asset)
+
+
+class TestHistory(unittest.TestCase):
+    def test_snapshot_round_trips_assets(self):
+        char = make_char()
+        rev = History(char).head
+        self.assertEqual([asset_data(a) for a in rev.assets],
+                         [asset_data(a) for a in char.assets])
+
+    def test_edit_keeps_repeated_properties(self):
+        rev = History(make_char()).head.edit_asset(0, functional="A silver bell", Limited=2)
+        self.assertEqual(dump_asset_props(rev.assets[0]),
+                         [("Aspect", {"aspect": "Loud"}),
+                          ("Aspect", {"aspect": "Shiny"}),
+                          ("Limited", {"ranks": 2})])
+
+    def test_edit_repeated_class_is_rejected(self):
+        with self.assertRaises(ValueError):
+            History(make_char()).head.edit_asset(0, Aspect={"aspect": "Quiet"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import concurrent.futures
+import os
+import unittest
+
+from jadepunk.intern import Interner
+from jadepunk.loader import RenderContext
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+SHEETS = [os.path.join(EXAMPLES, "mitsune.yml"),
+          os.path.join(EXAMPLES, "patience.yml")]
+ROUNDS = 20
+THREADS = 16
+
+
+class TestThreadedRender(unittest.TestCase):
+    def test_shared_context_matches_serial(self):
+        for engine in ["markdown", "moinmoin"]:
+            ctx = RenderContext(engine, interner=Interner())
+            expected = {sheet: ctx.render_yaml(sheet) for sheet in SHEETS}
+            jobs = SHEETS * ROUNDS * THREADS
+            with concurrent.futures.ThreadPoolExecutor(THREADS) as pool:
+                results = list(pool.map(ctx.render_yaml, jobs))
+            for sheet, result in zip(jobs, results):
+                self.assertEqual(result, expected[sheet])
+
+
+if __name__ == "__main__":
+    unittest.main()